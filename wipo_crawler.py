@@ -1,12 +1,11 @@
 """
-WIPO PatentScope Crawler V3.1 - SEARCH PARSER FIX
+WIPO PatentScope Crawler V3.2 - SHARED BROWSER
 ==================================================
 
-MUDANÇA V3.0 → V3.1:
-- Parser de WO numbers mais robusto
-- Suporta múltiplos formatos de HTML
-- Fallback para regex se links não encontrados
-- Logs detalhados de parsing
+MUDANÇA V3.1 → V3.2:
+- Browser Chromium único para toda a busca (launch 1x, não 1x por WO)
+- Economiza ~1-3s de cold-start por WO
+- Isolamento mantido via browser.new_context() por WO
 
 MANTIDO:
 - Arquitetura isolada (contextos por WO)
@@ -15,11 +14,14 @@ MANTIDO:
 """
 
 import asyncio
+import functools
 import httpx
 import logging
+import time
+from html import unescape as html_unescape
 from typing import List, Dict, Optional, Any
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+from bs4 import BeautifulSoup, SoupStrainer
+from playwright.async_api import async_playwright, Browser, TimeoutError as PlaywrightTimeout
 import re
 
 # Logging
@@ -37,13 +39,69 @@ DETAIL_URL = f"{BASE_URL}/search/en/detail.jsf"
 # Timeouts (ms)
 PAGE_TIMEOUT = 45000
 NAVIGATION_TIMEOUT = 30000
-NETWORKIDLE_TIMEOUT = 5000
+
+# Launch args (browser compartilhado entre WOs)
+BROWSER_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--no-sandbox"
+]
+
+# Assets que o parser não precisa (só lemos texto de ps-field--label/value)
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+BLOCKED_HOSTS = ("google-analytics.com", "doubleclick.net", "facebook.net")
+
+# Fallback BS4: só construir a árvore dos blocos biblio (ps-field /
+# patent-classification) - pula <head>, scripts JSF/PrimeFaces, nav etc
+BIBLIO_STRAINER = SoupStrainer(class_=["ps-field", "patent-classification"])
+
+# Regex pré-compilados (evita re.compile por chamada em N WOs x ~10 campos)
+_WO_DOCID_RE = re.compile(r'docId=(WO\d{4}\d{6})')
+_WO_NUMBER_RE = re.compile(r'\bWO\d{4}\d{6}\b')
+
+
+@functools.lru_cache(maxsize=None)
+def _label_block_re(label_text: str):
+    """Regex que localiza o span do label no HTML cru, cacheado por label"""
+    return re.compile(r'ps-field--label[^>]*>\s*' + re.escape(label_text), re.IGNORECASE)
+
+# ============================================================================
+# SHARED HTTP CLIENT (HTTP/2 + KEEP-ALIVE)
+# ============================================================================
+
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """
+    Cliente httpx compartilhado entre buscas (lazy init)
+
+    Reusa conexões TCP/TLS entre chamadas - evita handshake por busca
+    """
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    return _CLIENT
+
+
+async def close_client():
+    """Fecha o cliente compartilhado (chamar em shutdown hooks)"""
+    global _CLIENT
+    if _CLIENT is not None and not _CLIENT.is_closed:
+        await _CLIENT.aclose()
+    _CLIENT = None
+
 
 # ============================================================================
 # STEP 1: SEARCH WO NUMBERS (HTTPX - IMPROVED PARSER)
 # ============================================================================
 
-async def search_wipo_wo_numbers(molecule: str, dev_codes: List[str] = None, 
+async def search_wipo_wo_numbers(molecule: str, dev_codes: List[str] = None,
                                   cas: str = None, max_results: int = 50) -> List[str]:
     """
     Busca WO numbers via HTTPX (não precisa Playwright)
@@ -63,69 +121,51 @@ async def search_wipo_wo_numbers(molecule: str, dev_codes: List[str] = None,
     logger.info(f"🔍 WIPO search query: {query}")
     
     params = {"query": f"FP:({query})"}
-    
-    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-        try:
-            response = await client.get(SEARCH_URL, params=params)
-            response.raise_for_status()
-            
-            html = response.text
-            logger.debug(f"Search HTML length: {len(html)} chars")
-            
-            # ===== ESTRATÉGIA 1: Links com docId =====
-            wo_numbers = _extract_wo_from_links(html)
-            
+
+    try:
+        client = await _get_client()
+        response = await client.get(SEARCH_URL, params=params)
+        response.raise_for_status()
+
+        html = response.text
+        logger.debug(f"Search HTML length: {len(html)} chars")
+
+        # ===== ESTRATÉGIA 1: Links com docId =====
+        wo_numbers = _extract_wo_from_links(html)
+
+        if wo_numbers:
+            logger.info(f"✅ Strategy 1 (links): Found {len(wo_numbers)} WO patents")
+        else:
+            # ===== ESTRATÉGIA 2: Regex no HTML completo =====
+            logger.warning("Strategy 1 failed, trying regex fallback...")
+            wo_numbers = _extract_wo_from_regex(html)
+
             if wo_numbers:
-                logger.info(f"✅ Strategy 1 (links): Found {len(wo_numbers)} WO patents")
+                logger.info(f"✅ Strategy 2 (regex): Found {len(wo_numbers)} WO patents")
             else:
-                # ===== ESTRATÉGIA 2: Regex no HTML completo =====
-                logger.warning("Strategy 1 failed, trying regex fallback...")
-                wo_numbers = _extract_wo_from_regex(html)
-                
-                if wo_numbers:
-                    logger.info(f"✅ Strategy 2 (regex): Found {len(wo_numbers)} WO patents")
-                else:
-                    logger.error("❌ Both strategies failed to find WO numbers")
-                    logger.debug(f"HTML preview: {html[:500]}")
-            
-            # Remove duplicatas e limita
-            wo_numbers = list(dict.fromkeys(wo_numbers))[:max_results]
-            
-            return wo_numbers
-            
-        except Exception as e:
-            logger.error(f"❌ Search failed: {e}")
-            return []
+                logger.error("❌ Both strategies failed to find WO numbers")
+                logger.debug(f"HTML preview: {html[:500]}")
+
+        # Remove duplicatas e limita
+        wo_numbers = list(dict.fromkeys(wo_numbers))[:max_results]
+
+        return wo_numbers
+
+    except Exception as e:
+        logger.error(f"❌ Search failed: {e}")
+        return []
 
 
 def _extract_wo_from_links(html: str) -> List[str]:
     """
-    Estratégia 1: Extrair WO numbers de links (método preferencial)
-    
-    Procura por:
-    - <a href="...detail.jsf?docId=WO2019028689">
-    - <a href="...WO2019028689">
+    Estratégia 1: Extrair WO numbers de links docId (método preferencial)
+
+    Procura por: <a href="...detail.jsf?docId=WO2019028689">
+
+    Regex direto no HTML cru - o formato da página é conhecido, não
+    precisa construir DOM só para iterar <a href>
     """
-    soup = BeautifulSoup(html, 'html.parser')
-    wo_numbers = []
-    
-    # Procurar links com docId
-    for link in soup.find_all('a', href=True):
-        href = link['href']
-        
-        # Pattern 1: detail.jsf?docId=WO...
-        if 'detail.jsf?docId=' in href or 'docId=' in href:
-            match = re.search(r'docId=(WO\d{4}\d{6})', href)
-            if match:
-                wo_numbers.append(match.group(1))
-        
-        # Pattern 2: Link direto com WO number
-        elif 'WO' in href:
-            match = re.search(r'(WO\d{4}\d{6})', href)
-            if match:
-                wo_numbers.append(match.group(1))
-    
-    return wo_numbers
+    return _WO_DOCID_RE.findall(html)
 
 
 def _extract_wo_from_regex(html: str) -> List[str]:
@@ -136,8 +176,7 @@ def _extract_wo_from_regex(html: str) -> List[str]:
     Exemplo: WO2019028689
     """
     # Padrão WO + ano (4 dígitos) + número (6 dígitos)
-    pattern = r'\bWO\d{4}\d{6}\b'
-    matches = re.findall(pattern, html)
+    matches = _WO_NUMBER_RE.findall(html)
     
     # Validar que são WO numbers válidos (ano razoável)
     valid_wos = []
@@ -150,202 +189,588 @@ def _extract_wo_from_regex(html: str) -> List[str]:
 
 
 # ============================================================================
-# STEP 2: FETCH DETAIL PAGE (PLAYWRIGHT - UNCHANGED)
+# BROWSER POOL (WARM BROWSERS + LIFECYCLE CAPS)
 # ============================================================================
 
-async def fetch_detail_html(wo_number: str, headless: bool = True) -> Optional[str]:
+# Contextos simultâneos permitidos por browser do pool
+CONTEXTS_PER_BROWSER = 8
+
+
+class _BrowserInstance:
+    """Um browser do pool com contadores de ciclo de vida"""
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.pages_processed = 0
+        self.active_contexts = 0
+        self.retired = False
+        self.created_at = time.monotonic()
+
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+class BrowserPool:
     """
-    Carrega página de detalhe via Playwright e retorna HTML final
-    
+    Pool de browsers Chromium quentes para serviços long-running
+
+    - Browsers ficam vivos entre requests (sem cold-start de ~1-3s cada)
+    - Rotação após max_pages_per_browser usos ou max_age_seconds
+      (Chrome cresce memória indefinidamente em sessões longas)
+    - Rotação é graciosa: o browser sai do slot mas só fecha quando o
+      último contexto em voo for devolvido (WOs concorrentes não caem)
+    - Browser crashado é substituído no próximo acquire (não derruba
+      o pipeline inteiro)
+    """
+
+    def __init__(self, size: int = 2, max_pages_per_browser: int = 50,
+                 max_age_seconds: int = 300, headless: bool = True):
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_age_seconds = max_age_seconds
+        self.headless = headless
+
+        self._playwright = None
+        self._instances: List[Optional[_BrowserInstance]] = [None] * size
+        self._pending: List[Optional[asyncio.Future]] = [None] * size
+        self._retired: List[_BrowserInstance] = []
+        self._owners: Dict[Any, _BrowserInstance] = {}
+        self._next = 0
+        self._lock = asyncio.Lock()
+        self._pw_lock = asyncio.Lock()
+        self._sem = asyncio.Semaphore(size * CONTEXTS_PER_BROWSER)
+
+    async def _create_instance(self) -> _BrowserInstance:
+        """Lança um browser novo com os args padrão (roda FORA do _lock)"""
+        async with self._pw_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+        browser = await self._playwright.chromium.launch(
+            headless=self.headless,
+            args=BROWSER_ARGS
+        )
+        logger.info("🚀 Browser pool: new Chromium instance launched")
+        return _BrowserInstance(browser)
+
+    def _needs_rotation(self, instance: Optional[_BrowserInstance]) -> bool:
+        """Browser morto, velho demais ou com usos demais deve ser trocado"""
+        if instance is None:
+            return True
+        if not instance.browser.is_connected():
+            logger.warning("⚠️  Browser pool: instance crashed, replacing")
+            return True
+        if instance.pages_processed >= self.max_pages_per_browser:
+            return True
+        if instance.age_seconds() >= self.max_age_seconds:
+            return True
+        return False
+
+    async def _retire(self, instance: _BrowserInstance):
+        """
+        Tira o browser de circulação SEM matar os contextos em voo
+
+        Fecha já se ninguém o usa; senão o último release() fecha
+        """
+        instance.retired = True
+        if instance.active_contexts == 0:
+            await self._close_browser(instance)
+        else:
+            self._retired.append(instance)
+
+    @staticmethod
+    async def _close_browser(instance: _BrowserInstance):
+        try:
+            await instance.browser.close()
+        except Exception:
+            pass
+
+    async def acquire(self):
+        """
+        Retorna um BrowserContext isolado de um browser quente
+
+        Devolver SEMPRE via release() (fecha contexto e libera slot)
+        """
+        await self._sem.acquire()
+        try:
+            async with self._lock:
+                slot = self._next % self.size
+                self._next += 1
+
+                instance = self._instances[slot]
+                pending = self._pending[slot]
+
+                if pending is None and self._needs_rotation(instance):
+                    if instance is not None:
+                        await self._retire(instance)
+                        self._instances[slot] = None
+                    # Launch do substituto (1-3s de cold-start) acontece FORA
+                    # do lock: rotação num slot não trava os acquires dos
+                    # outros. O future fica no slot para acquires concorrentes
+                    # esperarem o MESMO browser em vez de lançar outro.
+                    pending = asyncio.ensure_future(self._create_instance())
+                    self._pending[slot] = pending
+
+            if pending is not None:
+                try:
+                    instance = await pending
+                except BaseException:
+                    async with self._lock:
+                        if self._pending[slot] is pending:
+                            self._pending[slot] = None
+                    raise
+
+                async with self._lock:
+                    if self._pending[slot] is pending:
+                        self._instances[slot] = instance
+                        self._pending[slot] = None
+
+            async with self._lock:
+                instance.pages_processed += 1
+                instance.active_contexts += 1
+
+            try:
+                context = await instance.browser.new_context(
+                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+                    viewport={"width": 1920, "height": 1080}
+                )
+            except BaseException:
+                async with self._lock:
+                    instance.active_contexts -= 1
+                raise
+
+            self._owners[context] = instance
+            return context
+
+        except BaseException:
+            self._sem.release()
+            raise
+
+    async def release(self, context):
+        """Fecha o contexto e libera o slot do pool"""
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+        instance = self._owners.pop(context, None)
+        if instance is not None:
+            async with self._lock:
+                instance.active_contexts -= 1
+                # Último contexto de um browser aposentado: agora pode fechar
+                if instance.retired and instance.active_contexts == 0:
+                    if instance in self._retired:
+                        self._retired.remove(instance)
+                    await self._close_browser(instance)
+
+        self._sem.release()
+
+    async def close(self):
+        """Fecha todos os browsers (ativos e aposentados) e o Playwright"""
+        async with self._lock:
+            # Launches em andamento: espera terminar e fecha o browser
+            for i, pending in enumerate(self._pending):
+                if pending is not None:
+                    self._pending[i] = None
+                    try:
+                        await self._close_browser(await pending)
+                    except Exception:
+                        pass
+
+            for i, instance in enumerate(self._instances):
+                if instance is not None:
+                    await self._close_browser(instance)
+                    self._instances[i] = None
+
+            for instance in self._retired:
+                await self._close_browser(instance)
+            self._retired.clear()
+            self._owners.clear()
+
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+_POOL: Optional[BrowserPool] = None
+
+
+async def get_browser_pool(headless: bool = True) -> BrowserPool:
+    """
+    Pool singleton do módulo (lazy init)
+
+    headless só é aplicado na criação do pool; chamadas seguintes com
+    valor diferente reusam o pool existente (avisado no log)
+    """
+    global _POOL
+    if _POOL is None:
+        _POOL = BrowserPool(headless=headless)
+    elif _POOL.headless != headless:
+        logger.warning(
+            f"⚠️  Browser pool already running with headless={_POOL.headless}; "
+            f"ignoring headless={headless} (call shutdown_browser_pool() first to change it)"
+        )
+    return _POOL
+
+
+async def shutdown_browser_pool():
+    """Fecha o pool (chamar em shutdown hooks junto com close_client)"""
+    global _POOL
+    if _POOL is not None:
+        await _POOL.close()
+    _POOL = None
+
+
+# ============================================================================
+# STEP 2: FETCH + PARSE DETAIL PAGE (PLAYWRIGHT)
+# ============================================================================
+
+async def _route_filter(route):
+    """
+    Aborta requests de assets não-essenciais (imagens/fontes/media/CSS
+    e beacons de analytics) - o parser só precisa do texto do HTML
+    """
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    elif any(host in request.url for host in BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def fetch_and_parse(wo_number: str, pool: BrowserPool) -> Optional[Dict[str, Any]]:
+    """
+    Carrega página de detalhe via Playwright e já parseia o biblio
+
     CRÍTICO:
     - JSF leva ~25s para carregar completamente
-    - Usa contexto isolado (não contamina entre WOs)
+    - Usa contexto isolado de um browser quente do pool (não contamina
+      entre WOs)
     - Timeout garantido (não trava)
-    
-    Retorna: HTML completo ou None se falhar
+    - HTML cru (~1MB) vive só dentro desta função - parse imediato e
+      descarte, baixando o pico de memória por WO em concorrência alta
+
+    Retorna: dict de parse_biblio_data ou None se falhar
     """
     url = f"{DETAIL_URL}?docId={wo_number}"
-    
+
+    # Contexto isolado para este WO (cookies/storage não vazam entre WOs)
+    context = await pool.acquire()
+
     try:
-        async with async_playwright() as p:
-            # Contexto isolado para este WO
-            browser = await p.chromium.launch(headless=headless)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-                viewport={"width": 1920, "height": 1080}
+        # Bloquear assets inúteis (imagens, fontes, CSS, analytics)
+        # Reduz banda e encurta a janela de "networkidle" do JSF
+        await context.route("**/*", _route_filter)
+
+        page = await context.new_page()
+
+        # Timeout global da página
+        page.set_default_timeout(PAGE_TIMEOUT)
+
+        # Navigate
+        logger.info(f"  Loading {wo_number}...")
+        await page.goto(url, timeout=NAVIGATION_TIMEOUT, wait_until="domcontentloaded")
+
+        # Esperar dado crítico aparecer (networkidle é flaky em páginas JSF
+        # com long-poll/analytics - o seletor sozinho já garante o dado).
+        # Esperar pelo VALUE, não pelo label: o JSF monta o template com
+        # labels antes do XHR de dados; o primeiro ps-field--value visível
+        # prova que o dado chegou, e retorna no instante em que isso ocorre
+        try:
+            await page.wait_for_selector(
+                'span.ps-field--value',
+                state='visible',
+                timeout=12000
             )
-            page = await context.new_page()
-            
-            # Timeout global da página
-            page.set_default_timeout(PAGE_TIMEOUT)
-            
-            try:
-                # Navigate
-                logger.info(f"  Loading {wo_number}...")
-                await page.goto(url, timeout=NAVIGATION_TIMEOUT, wait_until="domcontentloaded")
-                
-                # Esperar network idle (JSF faz múltiplos AJAX)
-                try:
-                    await page.wait_for_load_state("networkidle", timeout=NETWORKIDLE_TIMEOUT)
-                except PlaywrightTimeout:
-                    logger.warning(f"  {wo_number}: networkidle timeout, continuing...")
-                
-                # Esperar dado crítico aparecer (fallback robusto)
-                try:
-                    await page.wait_for_selector(
-                        'text="Publication Number"',
-                        timeout=10000
-                    )
-                except PlaywrightTimeout:
-                    logger.error(f"  {wo_number}: Publication Number never appeared!")
-                    await browser.close()
-                    return None
-                
-                # Pegar HTML final
-                html = await page.content()
-                await browser.close()
-                
-                logger.info(f"  ✅ HTML loaded: {len(html)} chars")
-                return html
-                
-            except PlaywrightTimeout as e:
-                logger.error(f"  ❌ Timeout loading {wo_number}: {e}")
-                await browser.close()
-                return None
-                
-            except Exception as e:
-                logger.error(f"  ❌ Error loading {wo_number}: {e}")
-                await browser.close()
-                return None
-                
+        except PlaywrightTimeout:
+            logger.error(f"  {wo_number}: biblio values never appeared!")
+            return None
+
+        # Pegar HTML final e parsear na hora (string não sai daqui)
+        html = await page.content()
+        logger.info(f"  ✅ HTML loaded: {len(html)} chars")
+
+        data = parse_biblio_data(html, wo_number)
+        del html
+        return data
+
+    except PlaywrightTimeout as e:
+        logger.error(f"  ❌ Timeout loading {wo_number}: {e}")
+        return None
+
     except Exception as e:
-        logger.error(f"❌ Playwright init failed for {wo_number}: {e}")
+        logger.error(f"  ❌ Error loading {wo_number}: {e}")
         return None
 
+    finally:
+        await pool.release(context)
+
 
 # ============================================================================
-# STEP 3: PARSE BIBLIO DATA (BEAUTIFULSOUP - UNCHANGED)
+# STEP 3a: PARSE BIBLIO DATA - FAST PATH (REGEX NO HTML CRU)
 # ============================================================================
-
-def extract_field_by_label(soup: BeautifulSoup, label_text: str) -> Optional[str]:
+# O markup da WIPO é estável: labels/values são sempre spans irmãos
+# ps-field--label / ps-field--value. Regex direto no HTML cru evita
+# construir a árvore inteira (~10-30x mais rápido que BS4 aqui).
+
+# Label é texto puro ([^<]+?): com (.*?) + DOTALL o match de um campo
+# só-label (Applicants/Inventors/IPC, sem span de value) vazaria por
+# cima das tags até o value do campo seguinte, engolindo o label dele
+_FIELD_RE = re.compile(
+    r'<span class="ps-field--label"[^>]*>\s*([^<]+?)\s*</span>\s*'
+    r'<span class="ps-field--value"[^>]*>(.*?)</span>',
+    re.DOTALL
+)
+_PERSON_NAME_RE = re.compile(r'class="biblio-person-list--name"[^>]*>([^<]+)<')
+_CLASSIFICATION_CODE_RE = re.compile(
+    r'class="patent-classification[^"]*"[^>]*>.*?<a[^>]*>([^<]+)</a>',
+    re.DOTALL
+)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+
+
+def _clean_fragment(fragment: str) -> Optional[str]:
+    """Remove tags, decodifica entities e normaliza whitespace"""
+    text = _TAG_RE.sub(' ', fragment)
+    text = html_unescape(text)
+    text = _WS_RE.sub(' ', text).strip()
+    return text if text else None
+
+
+def _extract_fields_regex(html: str) -> Dict[str, str]:
     """
-    Extrai valor de campo baseado no label (estrutura semântica)
+    Passada única no HTML cru: {label (lowercase): value} para todos
+    os pares ps-field--label/value
     """
-    try:
-        # Buscar label
-        label = soup.find('span', class_='ps-field--label', string=re.compile(label_text, re.IGNORECASE))
-        if not label:
-            return None
-        
-        # Subir para div container
-        field_div = label.find_parent('div', class_='ps-field')
-        if not field_div:
-            return None
-        
-        # Pegar value (span seguinte)
-        value_span = field_div.find('span', class_='ps-field--value')
-        if not value_span:
-            return None
-        
-        # Extrair texto limpo
-        text = value_span.get_text(strip=True, separator=' ')
-        return text if text else None
-        
-    except Exception as e:
-        logger.debug(f"Field '{label_text}' extraction failed: {e}")
+    fields = {}
+    for m in _FIELD_RE.finditer(html):
+        label = _clean_fragment(m.group(1))
+
+        raw_value = m.group(2)
+        if '<span' in raw_value:
+            # Value com spans aninhados (ex: títulos/abstracts com spans de
+            # tradução): o non-greedy pararia no primeiro </span> e truncaria
+            # o texto. Recaptura até a fronteira mais próxima: próximo label,
+            # </div> do ps-field ou <script - sem fronteira o último campo da
+            # página absorveria texto de ViewState/PrimeFaces até o fim do doc
+            start = m.start(2)
+            cutoffs = [
+                html.find('<span class="ps-field--label', start),
+                html.find('</div>', start),
+                html.find('<script', start),
+            ]
+            end = min((c for c in cutoffs if c != -1), default=len(html))
+            raw_value = html[start:end]
+
+        value = _clean_fragment(raw_value)
+        if label and value:
+            fields.setdefault(label.lower(), value)
+    return fields
+
+
+def _lookup_field(fields: Dict[str, str], label_text: str) -> Optional[str]:
+    """Busca por label exato, com fallback por prefixo (ex: trailing ':')"""
+    key = label_text.lower()
+    if key in fields:
+        return fields[key]
+    for k, v in fields.items():
+        if k.startswith(key):
+            return v
+    return None
+
+
+def _field_block(html: str, label_text: str) -> Optional[str]:
+    """Recorta o trecho do HTML entre o label pedido e o próximo label"""
+    m = _label_block_re(label_text).search(html)
+    if not m:
         return None
+    end = html.find('ps-field--label', m.end())
+    return html[m.end():end if end != -1 else len(html)]
 
 
-def extract_list_field(soup: BeautifulSoup, label_text: str) -> List[str]:
-    """
-    Extrai campos de lista (Applicants, Inventors)
-    """
-    try:
-        label = soup.find('span', class_='ps-field--label', string=re.compile(label_text, re.IGNORECASE))
-        if not label:
-            return []
-        
-        field_div = label.find_parent('div', class_='ps-field')
-        if not field_div:
-            return []
-        
-        # Pegar lista de pessoas
-        person_list = field_div.find('ul', class_='biblio-person-list')
-        if not person_list:
-            return []
-        
-        names = []
-        for li in person_list.find_all('li'):
-            name_span = li.find('span', class_='biblio-person-list--name')
-            if name_span:
-                name = name_span.get_text(strip=True)
-                if name:
-                    names.append(name)
-        
-        return names
-        
-    except Exception as e:
-        logger.debug(f"List field '{label_text}' extraction failed: {e}")
+def _extract_person_list_regex(html: str, label_text: str) -> List[str]:
+    """Extrai listas de pessoas (Applicants, Inventors) direto do HTML"""
+    block = _field_block(html, label_text)
+    if not block:
+        return []
+    return [name.strip() for name in _PERSON_NAME_RE.findall(block) if name.strip()]
+
+
+def _extract_classification_codes_regex(html: str, label_text: str) -> List[str]:
+    """Extrai códigos de classificação (IPC ou CPC) direto do HTML"""
+    block = _field_block(html, label_text)
+    if not block:
         return []
+    return [code.strip() for code in _CLASSIFICATION_CODE_RE.findall(block) if code.strip()]
+
+
+# ============================================================================
+# STEP 3b: PARSE BIBLIO DATA (BEAUTIFULSOUP - FALLBACK)
+# ============================================================================
+
+# Mapeamento label (lowercase) -> chave do biblio_data
+_SCALAR_LABEL_KEYS = {
+    "publication number": "publication_number",
+    "publication date": "publication_date",
+    "international application no": "application_number",
+    "international filing date": "filing_date",
+    "title": "title",
+    "abstract": "abstract",
+    "priority data": "priority_data",
+}
+_LIST_LABEL_KEYS = {
+    "applicants": "applicants",
+    "inventors": "inventors",
+}
+_CLASSIFICATION_LABEL_KEYS = {
+    "ipc": "ipc_codes",
+    "cpc": "cpc_codes",
+}
+
+
+def _match_label(label: str, table: Dict[str, str]) -> Optional[str]:
+    """Match exato, com fallback por prefixo (ex: trailing ':')"""
+    if label in table:
+        return table[label]
+    for known, key in table.items():
+        if label.startswith(known):
+            return key
+    return None
+
+
+def _scalar_from_div(div) -> Optional[str]:
+    """Lê o value escalar de um div.ps-field"""
+    value_span = div.select_one('span.ps-field--value')
+    if not value_span:
+        return None
+    text = value_span.get_text(strip=True, separator=' ')
+    return text if text else None
+
+
+def _persons_from_div(div) -> List[str]:
+    """Lê a lista de pessoas (Applicants/Inventors) de um div.ps-field"""
+    names = []
+    for name_span in div.select('ul.biblio-person-list span.biblio-person-list--name'):
+        name = name_span.get_text(strip=True)
+        if name:
+            names.append(name)
+    return names
+
 
+def _codes_from_div(div) -> List[str]:
+    """Lê códigos de classificação (IPC/CPC) de um div.ps-field"""
+    codes = []
+    for link in div.select('div.patent-classification a'):
+        code = link.get_text(strip=True)
+        if code:
+            codes.append(code)
+    return codes
+
+
+def _parse_fields_soup(soup: BeautifulSoup) -> Dict[str, Any]:
+    """
+    Visitor de passada única: percorre cada div.ps-field 1x, lê
+    label + value juntos e despacha pro campo certo
 
-def extract_ipc_codes(soup: BeautifulSoup) -> List[str]:
-    """Extrai códigos IPC"""
+    Sem find_parent/find por label - custo O(nodes), não O(labels x nodes)
+    """
+    out = {}
     try:
-        ipc_codes = []
-        
-        label = soup.find('span', class_='ps-field--label', string=re.compile('IPC', re.IGNORECASE))
-        if not label:
-            return []
-        
-        field_div = label.find_parent('div', class_='ps-field')
-        if not field_div:
-            return []
-        
-        for classification in field_div.find_all('div', class_='patent-classification'):
-            link = classification.find('a')
-            if link:
-                code = link.get_text(strip=True)
-                if code:
-                    ipc_codes.append(code)
-        
-        return ipc_codes
-        
+        for div in soup.select('div.ps-field'):
+            label_span = div.select_one('span.ps-field--label')
+            if not label_span:
+                continue
+            label = label_span.get_text(strip=True).lower()
+
+            key = _match_label(label, _LIST_LABEL_KEYS)
+            if key:
+                persons = _persons_from_div(div)
+                if persons:
+                    out.setdefault(key, persons)
+                continue
+
+            key = _match_label(label, _CLASSIFICATION_LABEL_KEYS)
+            if key:
+                codes = _codes_from_div(div)
+                if codes:
+                    out.setdefault(key, codes)
+                continue
+
+            key = _match_label(label, _SCALAR_LABEL_KEYS)
+            if key:
+                value = _scalar_from_div(div)
+                if value:
+                    out.setdefault(key, value)
+
     except Exception as e:
-        logger.debug(f"IPC extraction failed: {e}")
-        return []
+        logger.debug(f"Single-pass field walk failed: {e}")
+
+    return out
 
 
 def parse_biblio_data(html: str, wo_number: str) -> Dict[str, Any]:
     """
     Parser principal - extrai todos os campos bibliográficos
+
+    Fast path: regex direto no HTML cru (markup da WIPO é estável).
+    Fallback: BeautifulSoup/lxml só se o regex não achar os campos obrigatórios.
     """
-    soup = BeautifulSoup(html, 'html.parser')
-    
     data = {
         "wo_number": wo_number,
         "source": "WIPO",
         "extraction_successful": False,
         "biblio_data": {}
     }
-    
+
+    # Página de erro/rate-limit do JSF não tem markup de biblio - checagem
+    # de substring (memchr em C) é muito mais barata que qualquer parse
+    if "ps-field--label" not in html:
+        logger.warning(f"  ⚠️  {wo_number}: biblio markup absent (error page?)")
+        return data
+
     try:
-        # Campos simples
-        pub_number = extract_field_by_label(soup, "Publication Number")
-        pub_date = extract_field_by_label(soup, "Publication Date")
-        app_number = extract_field_by_label(soup, "International Application No")
-        filing_date = extract_field_by_label(soup, "International Filing Date")
-        title = extract_field_by_label(soup, "Title")
-        abstract = extract_field_by_label(soup, "Abstract")
-        priority = extract_field_by_label(soup, "Priority Data")
-        
-        # Campos de lista
-        applicants = extract_list_field(soup, "Applicants")
-        inventors = extract_list_field(soup, "Inventors")
-        
-        # IPC codes
-        ipc_codes = extract_ipc_codes(soup)
-        
+        # Fast path: passada única de regex
+        fields = _extract_fields_regex(html)
+
+        pub_number = _lookup_field(fields, "Publication Number")
+        pub_date = _lookup_field(fields, "Publication Date")
+        app_number = _lookup_field(fields, "International Application No")
+        filing_date = _lookup_field(fields, "International Filing Date")
+        title = _lookup_field(fields, "Title")
+        abstract = _lookup_field(fields, "Abstract")
+        priority = _lookup_field(fields, "Priority Data")
+
+        applicants = _extract_person_list_regex(html, "Applicants")
+        inventors = _extract_person_list_regex(html, "Inventors")
+        ipc_codes = _extract_classification_codes_regex(html, "IPC")
+        cpc_codes = _extract_classification_codes_regex(html, "CPC")
+
+        # Fallback BS4 se o fast path não achou os campos obrigatórios
+        if not (pub_number and title):
+            logger.debug(f"  {wo_number}: regex fast path incomplete, falling back to BS4")
+            # lxml: ordens de grandeza mais rápido que html.parser nas páginas
+            # JSF de ~500KB-1MB da WIPO; strainer limita a árvore aos
+            # subtrees de biblio (todas as queries apontam pra dentro deles)
+            soup = BeautifulSoup(html, 'lxml', parse_only=BIBLIO_STRAINER)
+
+            # Passada única por div.ps-field: todos os campos de uma vez
+            fallback = _parse_fields_soup(soup)
+
+            pub_number = pub_number or fallback.get("publication_number")
+            pub_date = pub_date or fallback.get("publication_date")
+            app_number = app_number or fallback.get("application_number")
+            filing_date = filing_date or fallback.get("filing_date")
+            title = title or fallback.get("title")
+            abstract = abstract or fallback.get("abstract")
+            priority = priority or fallback.get("priority_data")
+
+            applicants = applicants or fallback.get("applicants", [])
+            inventors = inventors or fallback.get("inventors", [])
+            ipc_codes = ipc_codes or fallback.get("ipc_codes", [])
+            cpc_codes = cpc_codes or fallback.get("cpc_codes", [])
+
         # Montar biblio_data
         data["biblio_data"] = {
             "publication_number": pub_number,
@@ -357,6 +782,7 @@ def parse_biblio_data(html: str, wo_number: str) -> Dict[str, Any]:
             "applicants": applicants,
             "inventors": inventors,
             "ipc_codes": ipc_codes,
+            "cpc_codes": cpc_codes,
             "priority_data": priority
         }
         
@@ -377,15 +803,15 @@ def parse_biblio_data(html: str, wo_number: str) -> Dict[str, Any]:
 # STEP 4: PROCESS WO (ISOLATED + SAFE - UNCHANGED)
 # ============================================================================
 
-async def process_wo_safe(wo_number: str, headless: bool = True) -> Optional[Dict[str, Any]]:
+async def process_wo_safe(wo_number: str, pool: BrowserPool) -> Optional[Dict[str, Any]]:
     """Processa um WO de forma isolada e segura"""
     try:
         result = await asyncio.wait_for(
-            _process_wo_internal(wo_number, headless),
+            _process_wo_internal(wo_number, pool),
             timeout=60.0
         )
         return result
-        
+
     except asyncio.TimeoutError:
         logger.error(f"❌ {wo_number}: TIMEOUT TOTAL (60s)")
         return None
@@ -394,22 +820,19 @@ async def process_wo_safe(wo_number: str, headless: bool = True) -> Optional[Dic
         return None
 
 
-async def _process_wo_internal(wo_number: str, headless: bool) -> Optional[Dict[str, Any]]:
+async def _process_wo_internal(wo_number: str, pool: BrowserPool) -> Optional[Dict[str, Any]]:
     """Internal processing"""
-    
-    # Step 1: Fetch HTML
-    html = await fetch_detail_html(wo_number, headless=headless)
-    if not html:
-        logger.error(f"  ❌ Failed to fetch HTML for {wo_number}")
+
+    # Fetch + parse fundidos (HTML não atravessa camadas)
+    data = await fetch_and_parse(wo_number, pool)
+    if not data:
+        logger.error(f"  ❌ Failed to fetch {wo_number}")
         return None
-    
-    # Step 2: Parse
-    data = parse_biblio_data(html, wo_number)
-    
+
     if not data["extraction_successful"]:
         logger.error(f"  ❌ Failed to extract data from {wo_number}")
         return None
-    
+
     return data
 
 
@@ -424,55 +847,68 @@ async def search_wipo_patents(
     max_results: int = 50,
     groq_api_key: str = None,
     progress_callback = None,
-    headless: bool = True
+    headless: bool = True,
+    concurrency: int = 8
 ) -> List[Dict[str, Any]]:
     """
     API Principal do crawler WIPO
-    
-    V3.1 IMPROVEMENTS:
+
+    V3.2 IMPROVEMENTS:
+    - Browser único compartilhado entre todos os WOs (launch 1x)
+    - Processamento concorrente (Semaphore, default 8 WOs em paralelo)
     - Parser de WO numbers mais robusto
     - Fallback para regex
-    - Logs detalhados
     """
     logger.info(f"🌐 WIPO V3 search: {molecule}")
-    
+
     # Step 1: Search WO numbers
     if progress_callback:
         progress_callback(0, "Searching WIPO...")
-    
+
     wo_numbers = await search_wipo_wo_numbers(molecule, dev_codes, cas, max_results)
-    
+
     if not wo_numbers:
         logger.warning("No WO patents found")
         return []
-    
+
     # Limitar processamento
     wo_numbers = wo_numbers[:max_results]
     total = len(wo_numbers)
-    
-    logger.info(f"📄 Processing {total} WO patents...")
-    
-    # Step 2: Process each WO (isolated)
-    results = []
-    for i, wo_number in enumerate(wo_numbers, 1):
-        logger.info(f"[{i}/{total}] Processing {wo_number}...")
-        
-        if progress_callback:
-            progress_pct = int((i / total) * 100)
-            progress_callback(progress_pct, f"Processing {wo_number} ({i}/{total})")
-        
-        # Processar de forma isolada e segura
-        data = await process_wo_safe(wo_number, headless=headless)
-        
-        if data:
-            results.append(data)
-        
-        # Small delay entre WOs
-        if i < total:
-            await asyncio.sleep(1)
-    
+
+    logger.info(f"📄 Processing {total} WO patents ({concurrency} in parallel)...")
+
+    # Step 2: Process WOs concorrentemente (browsers quentes do pool,
+    # contexto isolado por WO). O pool fica vivo entre buscas - serviços
+    # long-running devem chamar shutdown_browser_pool() no shutdown hook.
+    sem = asyncio.Semaphore(concurrency)
+    progress_lock = asyncio.Lock()
+    done_count = 0
+
+    pool = await get_browser_pool(headless=headless)
+
+    async def bounded(wo_number: str) -> Optional[Dict[str, Any]]:
+        nonlocal done_count
+        async with sem:
+            logger.info(f"  Processing {wo_number}...")
+            data = await process_wo_safe(wo_number, pool)
+
+        async with progress_lock:
+            done_count += 1
+            if progress_callback:
+                progress_pct = int((done_count / total) * 100)
+                progress_callback(progress_pct, f"Processed {wo_number} ({done_count}/{total})")
+
+        return data
+
+    gathered = await asyncio.gather(
+        *[bounded(wo) for wo in wo_numbers],
+        return_exceptions=True
+    )
+
+    results = [r for r in gathered if isinstance(r, dict)]
+
     logger.info(f"✅ WIPO V3 complete: {len(results)}/{total} patents extracted")
-    
+
     return results
 
 
@@ -482,18 +918,22 @@ async def search_wipo_patents(
 
 async def test_wipo_v3():
     """Teste standalone"""
-    print("🧪 Testing WIPO Crawler V3.1...")
+    print("🧪 Testing WIPO Crawler V3.2...")
     print("=" * 60)
-    
-    results = await search_wipo_patents(
-        molecule="darolutamide",
-        dev_codes=["ODM-201", "BAY-1841788"],
-        max_results=5,
-        headless=True
-    )
-    
+
+    try:
+        results = await search_wipo_patents(
+            molecule="darolutamide",
+            dev_codes=["ODM-201", "BAY-1841788"],
+            max_results=5,
+            headless=True
+        )
+    finally:
+        await shutdown_browser_pool()
+        await close_client()
+
     print(f"\n✅ Retrieved {len(results)} patents")
-    
+
     if results:
         print("\n📄 First patent sample:")
         import json
@@ -501,4 +941,14 @@ async def test_wipo_v3():
 
 
 if __name__ == "__main__":
+    # uvloop: loop libuv, bem mais rápido que o loop default no workload
+    # socket-heavy (N páginas Playwright + httpx concorrentes). Serviços
+    # que importam este módulo devem chamar uvloop.install() no startup
+    # deles antes do asyncio.run() para o mesmo ganho.
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(test_wipo_v3())